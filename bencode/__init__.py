@@ -1,4 +1,5 @@
 """We import some functions here, so they are available on the package level"""
 from .bencode import decode, encode  # noqa
+from .patch import patch  # noqa
 from .torrent import decode_torrent, encode_torrent  # noqa
 from .transform import be_to_str, str_to_be  # noqa
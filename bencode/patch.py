@@ -0,0 +1,441 @@
+"""Code, for changing bencoded data without decoding/encoding all of it."""
+from typing import Any, Dict, Iterable, List, Optional, Tuple, Union
+
+from bencode import bencode
+
+Path = Tuple[Union[bytes, int], ...]
+
+Span = Tuple[int, int, bytes, Path]
+
+
+class _Leaf:  # pylint: disable=too-few-public-methods
+    """An internal container for a new value (None to delete the value)"""
+
+    def __init__(self, replacement: Optional[bytes]):
+        """Called when the object is created, sets its attributes"""
+        self.replacement = replacement
+
+
+def _build_targets(
+    changes: Dict[Path, Any], delete: Iterable[Path]
+) -> Dict[Any, Any]:
+    """Convert changed and deleted paths to a tree of targets
+
+    Args:
+        A dict of paths to new values and an iterable of paths to delete
+
+    Raises:
+        ValueError:
+            If some path is empty, is not a tuple or contains an element,
+            which is neither bytes nor int
+            If some path is used twice or is a prefix of another path
+
+    Returns:
+        A nested dictionary, where leaves are _Leaf objects
+    """
+    leaves: List[Tuple[Path, Optional[bytes]]] = [
+        (path, bencode.encode(value)) for path, value in changes.items()
+    ]
+    leaves.extend((path, None) for path in delete)
+
+    targets: Dict[Any, Any] = {}
+    for path, replacement in leaves:
+        if (
+            not isinstance(path, tuple)
+            or not path
+            or not all(_is_path_element(element) for element in path)
+        ):
+            raise ValueError(
+                f"Cannot patch data, expected a non-empty tuple of bytes "
+                f"and ints as a path, got {path!r} instead."
+            )
+
+        node = targets
+        for element in path[:-1]:
+            node = node.setdefault(element, {})
+            if isinstance(node, _Leaf):
+                raise ValueError(
+                    f"Cannot patch data, path {path!r} is inside of "
+                    "another changed or deleted path."
+                )
+
+        if path[-1] in node:
+            raise ValueError(
+                f"Cannot patch data, path {path!r} is used more than once "
+                "or contains another changed or deleted path."
+            )
+        node[path[-1]] = _Leaf(replacement)
+
+    return targets
+
+
+def _is_path_element(element: Any) -> bool:
+    """Check if the given object can be used as a dict key or a list index"""
+    if isinstance(element, bool):
+        return False
+    return isinstance(element, (bytes, int))
+
+
+def _scan(
+    data: bytes,
+    index: int,
+    targets: Dict[Any, Any],
+    path: Path,
+    spans: List[Span],
+) -> int:
+    """Find the end of a value, which starts at the given index
+
+    Every nested value (or dict entry), which matches some target, is
+    recorded to spans as (start, end, replacement, path). Values without
+    targets inside are skipped without being converted.
+
+    Args:
+        Some bencoded data, an index, where the value starts, targets inside
+        of the value, a path to the value and a list to record spans to
+
+    Raises:
+        ValueError: If bencoded data is incomplete or incorrect
+
+    Returns:
+        An index right after the value
+    """
+    if targets and index < len(data):
+        if data[index] == bencode.START_DICT:
+            return _scan_dict(data, index, targets, path, spans)
+
+        if data[index] == bencode.START_LIST:
+            return _scan_list(data, index, targets, path, spans)
+
+    return _skip(data, index)
+
+
+def _scan_bytes(data: bytes, index: int) -> Tuple[int, int]:
+    """Find the bounds of a byte string, which starts at the given index
+
+    Args:
+        Some bencoded data and an index, where the byte string starts
+
+    Raises:
+        ValueError: If bencoded data is incomplete or incorrect
+
+    Returns:
+        An index of the first byte of the string and an index right after it
+    """
+    delimiter_index = data.find(bencode.COLON, index)
+    if delimiter_index <= index:
+        raise ValueError(
+            "Cannot patch a byte string, it doesn't contain a delimiter. "
+            "Most likely the bencoded string is incomplete or incorrect."
+        )
+
+    length_prefix = data[index:delimiter_index]
+    if not length_prefix.isdigit():
+        raise ValueError(
+            f"Cannot patch a byte string, its length prefix {length_prefix!r} "
+            "is not a number. "
+            "Most likely the bencoded string is incomplete or incorrect."
+        )
+
+    start = delimiter_index + 1
+    end = start + int(length_prefix)
+    if end > len(data):
+        raise ValueError(
+            f"Cannot patch a byte string (prefix length - {end - start}, "
+            f"real_length - {len(data) - start}). "
+            "Most likely the bencoded string is incomplete or incorrect."
+        )
+
+    return start, end
+
+
+def _scan_dict(
+    data: bytes,
+    index: int,
+    targets: Dict[Any, Any],
+    path: Path,
+    spans: List[Span],
+) -> int:
+    """Find the end of a dict, which starts at the given index
+
+    Args:
+        Some bencoded data, an index, where the dict starts, targets inside
+        of the dict, a path to the dict and a list to record spans to
+
+    Raises:
+        ValueError: If bencoded data is incomplete or incorrect
+
+    Returns:
+        An index right after the dict
+    """
+    index += 1
+
+    while index < len(data) and data[index] != bencode.END_MARKER:
+        entry_start = index
+        if data[index] == bencode.START_INTEGER:
+            key: Any
+            key, index = _scan_int(data, index)
+        else:
+            key_start, index = _scan_bytes(data, index)
+            key = data[key_start:index]
+
+        target = targets.get(key)
+        if target is None:
+            index = _skip(data, index)
+        elif isinstance(target, dict):
+            index = _scan(data, index, target, path + (key,), spans)
+        else:
+            value_start = index
+            index = _skip(data, index)
+            # Deleting a dict value means deleting its key as well
+            if target.replacement is None:
+                spans.append((entry_start, index, b"", path + (key,)))
+            else:
+                spans.append(
+                    (value_start, index, target.replacement, path + (key,))
+                )
+
+    if index >= len(data):
+        raise ValueError(
+            "Cannot patch a dictionary, reached end of the bencoded "
+            "string before the end marker was found. Most likely the "
+            "bencoded string is incomplete or incorrect."
+        )
+
+    return index + 1
+
+
+def _find_int_end(data: bytes, index: int) -> int:
+    """Find the end marker of an integer, which starts at the given index
+
+    Args:
+        Some bencoded data and an index, where the integer starts
+
+    Raises:
+        ValueError: If bencoded data is incomplete or incorrect
+
+    Returns:
+        An index of the end marker
+    """
+    end_marker_index = data.find(bencode.END_MARKER, index + 1)
+    if end_marker_index <= index + 1:
+        raise ValueError(
+            "Cannot patch an integer, reached the end of the bencoded "
+            "string before the end marker was found. Most likely the "
+            "bencoded string is incomplete or incorrect."
+        )
+
+    return end_marker_index
+
+
+def _scan_int(data: bytes, index: int) -> Tuple[int, int]:
+    """Extract an integer, which starts at the given index
+
+    Args:
+        Some bencoded data and an index, where the integer starts
+
+    Raises:
+        ValueError: If bencoded data is incomplete or incorrect
+
+    Returns:
+        The integer and an index right after it
+    """
+    end_marker_index = _find_int_end(data, index)
+    value_start = index + 1
+    value_bytes = data[value_start:end_marker_index]
+    return int(value_bytes.decode("ascii")), end_marker_index + 1
+
+
+def _scan_list(
+    data: bytes,
+    index: int,
+    targets: Dict[Any, Any],
+    path: Path,
+    spans: List[Span],
+) -> int:
+    """Find the end of a list, which starts at the given index
+
+    List indexes in targets refer to positions in the original data.
+
+    Args:
+        Some bencoded data, an index, where the list starts, targets inside
+        of the list, a path to the list and a list to record spans to
+
+    Raises:
+        ValueError: If bencoded data is incomplete or incorrect
+
+    Returns:
+        An index right after the list
+    """
+    index += 1
+    position = 0
+
+    while index < len(data) and data[index] != bencode.END_MARKER:
+        target = targets.get(position)
+        if target is None:
+            index = _skip(data, index)
+        elif isinstance(target, dict):
+            index = _scan(data, index, target, path + (position,), spans)
+        else:
+            item_start = index
+            index = _skip(data, index)
+            spans.append(
+                (
+                    item_start,
+                    index,
+                    target.replacement or b"",
+                    path + (position,),
+                )
+            )
+        position += 1
+
+    if index >= len(data):
+        raise ValueError(
+            "Cannot patch a list, reached end of the bencoded string "
+            "before the end marker was found. Most likely the bencoded "
+            "string is incomplete or incorrect."
+        )
+
+    return index + 1
+
+
+def _skip(data: bytes, index: int) -> int:
+    """Find the end of a value, which starts at the given index
+
+    Unlike _scan, doesn't convert integers, slice dict keys or track
+    paths, only checks the structure of the value.
+
+    Args:
+        Some bencoded data and an index, where the value starts
+
+    Raises:
+        ValueError: If bencoded data is incomplete or incorrect
+
+    Returns:
+        An index right after the value
+    """
+    # Item counters of the open containers, None for a list
+    containers: List[Optional[int]] = []
+    data_length = len(data)
+
+    while True:
+        if index >= data_length:
+            _raise_skip_end_error(containers)
+
+        byte = data[index]
+
+        if 48 <= byte <= 57:
+            index = _scan_bytes(data, index)[1]
+        elif byte == bencode.START_INTEGER:
+            index = _find_int_end(data, index) + 1
+        else:
+            counter = containers[-1] if containers else None
+            expects_key = counter is not None and counter % 2 == 0
+
+            if byte == bencode.END_MARKER and (
+                expects_key or (containers and counter is None)
+            ):
+                containers.pop()
+                index += 1
+            elif expects_key:
+                raise ValueError(
+                    "Cannot patch a dictionary, expected a key to start with "
+                    f"'i' or a digit, got {chr(byte)!r} instead."
+                )
+            elif byte == bencode.START_DICT:
+                containers.append(0)
+                index += 1
+                continue
+            elif byte == bencode.START_LIST:
+                containers.append(None)
+                index += 1
+                continue
+            else:
+                raise ValueError(
+                    "Cannot patch data, expected the value to start with one "
+                    f"of 'd', 'i', 'l' or a digit, got {chr(byte)!r} instead."
+                )
+
+        if not containers:
+            return index
+        parent_counter = containers[-1]
+        if parent_counter is not None:
+            containers[-1] = parent_counter + 1
+
+
+def _raise_skip_end_error(containers: List[Optional[int]]) -> None:
+    """Explain, why the data ended while a value was being skipped
+
+    Args:
+        Item counters of the open containers, None for a list
+
+    Raises:
+        ValueError: Always
+    """
+    counter = containers[-1] if containers else None
+
+    if counter is not None and counter % 2 == 0:
+        container = "dictionary"
+    elif containers and counter is None:
+        container = "list"
+    else:
+        raise ValueError(
+            "Cannot patch data, reached the end of the bencoded string "
+            "before the value was found. Most likely the bencoded string "
+            "is incomplete or incorrect."
+        )
+
+    raise ValueError(
+        f"Cannot patch a {container}, reached end of the bencoded string "
+        "before the end marker was found. Most likely the bencoded string "
+        "is incomplete or incorrect."
+    )
+
+
+def patch(
+    data: bytes,
+    changes: Optional[Dict[Path, Any]] = None,
+    delete: Iterable[Path] = (),
+) -> bytes:
+    """Return a new bencoded string with some values changed or deleted.
+
+    Each path is a tuple of dict keys and list indexes, for example
+    (b"announce-list", 0, 0). Paths refer to the original, unpatched data,
+    so deleting a list item doesn't shift indexes of the following items.
+    Only the new values are encoded, every byte outside of the
+    changed/deleted values stays exactly the same.
+
+    Raises:
+        ValueError:
+            If the data is not of type bytes or is incorrect
+            If some path is incorrect, duplicated or not found in the data
+
+    Returns:
+        A patched bencoded string
+    """
+    if not isinstance(data, bytes):
+        raise ValueError(
+            f"Cannot patch data, expected bytes, got {type(data)} instead."
+        )
+
+    changes = changes or {}
+    delete = list(delete)
+    targets = _build_targets(changes, delete)
+    spans: List[Span] = []
+    _scan(data, 0, targets, (), spans)
+
+    found_paths = {span[3] for span in spans}
+    for path in list(changes) + delete:
+        if path not in found_paths:
+            raise ValueError(
+                f"Cannot patch data, path {path!r} was not found."
+            )
+
+    result = []
+    previous_end = 0
+    for start, end, replacement, _ in sorted(spans, key=lambda x: x[0]):
+        result.append(data[previous_end:start])
+        result.append(replacement)
+        previous_end = end
+    result.append(data[previous_end:])
+
+    return b"".join(result)
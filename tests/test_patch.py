@@ -0,0 +1,87 @@
+"""Tests for patch.py"""
+import pytest
+
+import bencode
+
+
+@pytest.mark.parametrize(
+    "source_data,changes,delete,result_data",
+    [
+        (b"i1e", {}, [], b"i1e"),
+        (b"d1:ai1ee", {(b"a",): 2}, [], b"d1:ai2ee"),
+        (b"d1:ai1ee", {(b"a",): [b"x"]}, [], b"d1:al1:xee"),
+        (b"d1:ai1e1:bi2ee", {}, [(b"a",)], b"d1:bi2ee"),
+        (b"li1ei2ei3ee", {(2,): b"abc"}, [(0,)], b"li2e3:abce"),
+        (b"di1e3:abce", {(1,): {}}, [], b"di1edee"),
+        (
+            b"d1:ad1:bl1:x1:yee1:ci3ee",
+            {(b"a", b"b", 1): b"z", (b"c",): -3},
+            [],
+            b"d1:ad1:bl1:x1:zee1:ci-3ee",
+        ),
+        # Non-canonical bytes outside of the patched values stay the same
+        (b"d1:zi01e1:ai1eetail", {(b"a",): 5}, [], b"d1:zi01e1:ai5eetail"),
+    ],
+)
+def test_patch_ok(source_data, changes, delete, result_data):
+    """Test basic patching features"""
+    assert bencode.patch(source_data, changes, delete) == result_data
+
+
+def test_patch_torrent_ok(datadir):
+    """Change a tracker in a real torrent file"""
+    torrent_data = datadir["big-buck-bunny.torrent"].read("rb")
+    patched_data = bencode.patch(
+        torrent_data,
+        {(b"announce",): b"udp://example.org:1337"},
+        delete=[(b"announce-list", 1), (b"url-list",)],
+    )
+
+    expected_data = bencode.decode(torrent_data)
+    expected_data[b"announce"] = b"udp://example.org:1337"
+    expected_data[b"announce-list"].pop(1)
+    expected_data.pop(b"url-list")
+    assert patched_data == bencode.encode(expected_data)
+
+
+@pytest.mark.parametrize(
+    "source_data,changes,delete,error_message",
+    [
+        ("i1e", {}, [], "expected bytes"),
+        (b"i1e", {(): 1}, [], "non-empty tuple"),
+        (b"i1e", {b"a": 1}, [], "non-empty tuple"),
+        (b"li1ei2ee", {(1.0,): 1}, [], "non-empty tuple"),
+        (b"li1ei2ee", {(True,): 1}, [], "non-empty tuple"),
+        (b"li1ei2ee", {}, [(0, [1])], "non-empty tuple"),
+        (b"d1:ai1ee", {(b"a",): 1}, [(b"a",)], "more than once"),
+        (b"d1:ai1ee", {(b"a", 0): 1}, [(b"a",)], "more than once"),
+        (b"d1:ai1ee", {(b"a",): 1}, [(b"a", 0)], "inside of"),
+        (b"d1:ai1ee", {(b"b",): 1}, [], "was not found"),
+        (b"li1ee", {(1,): 1}, [], "was not found"),
+        (b"d1:ai1ee", {(b"a",): {1.5}}, [], "not supported"),
+        (b"", {}, [], "before the value was found"),
+        (b"x", {}, [], "got 'x' instead"),
+        (b"d1:a", {}, [], "before the value was found"),
+        (b"d1:ai1e", {}, [], "Cannot patch a dictionary"),
+        (b"li1e", {}, [], "Cannot patch a list"),
+        (b"i1", {}, [], "Cannot patch an integer"),
+        (b"ie", {}, [], "Cannot patch an integer"),
+        (b"3abc", {}, [], "doesn't contain a delimiter"),
+        (b"5:abc", {}, [], r"prefix length - 5, real_length - 3\)"),
+        (b"d-4:e", {}, [], "got '-' instead"),
+        (b"d-625:5:i7", {}, [], "got '-' instead"),
+        (b"d+1:ai1ee", {}, [], "got '[+]' instead"),
+        (b"d 1:ai1ee", {}, [], "got ' ' instead"),
+        (b"l1a:xe", {}, [], "is not a number"),
+        (b"d+1:ai1ee", {(b"a",): 1}, [], "is not a number"),
+        (b"d-4:e", {(b"a",): 1}, [], "is not a number"),
+        (b"d1:ai1eie", {}, [], "Cannot patch an integer"),
+        (b"d1:aee", {}, [], "got 'e' instead"),
+        (b"dxe", {}, [], "expected a key"),
+        (b"d1:ali1eee", {(b"a", 0, 0): 1}, [], "was not found"),
+    ],
+)
+def test_patch_error(source_data, changes, delete, error_message):
+    """Test errors, which may happen while patching"""
+    with pytest.raises(ValueError, match=error_message):
+        bencode.patch(source_data, changes, delete)